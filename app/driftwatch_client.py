@@ -1,13 +1,15 @@
+import io
 import os
 import time
 import math
-import json
+import queue
+import random
 import logging
+import threading
+import orjson
 import psycopg2
-from psycopg2.extras import Json
-from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +17,55 @@ logger = logging.getLogger(__name__)
 MAX_BUFFER = 5000
 DEFAULT_BATCH_SIZE = 50
 DEFAULT_FLUSH_SECONDS = 5
+DEFAULT_FLUSH_BYTES = 256 * 1024  # Estimated payload size that triggers a write
+ROW_OVERHEAD_BYTES = 80  # Rough per-row cost of the non-JSON columns
 MAX_RETRIES = 5
+# Errors worth retrying and keeping a batch for: the connection or server, not the data
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, OSError)
+RETRY_BASE_WAIT = 0.1  # Seconds; decorrelated-jitter backoff floor
+RETRY_MAX_WAIT = 5.0   # Seconds; cap on a single backoff sleep
 CONNECT_TIMEOUT = 3
-STATEMENT_TIMEOUT = "3000ms"
+STATEMENT_TIMEOUT = "3000ms"  # Applies to the whole session of the persistent connection
+# orjson writes NaN/Inf as null at any depth; NumPy values and non-str keys are accepted
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+COPY_THRESHOLD = 500  # Batches at least this large go through COPY instead of INSERT
+
+_STOP = object()  # Queue sentinel: drain and stop the worker
+
+COLUMNS = "ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json"
+COLUMN_TYPES = "timestamptz[], text[], text[], text[], text[], int[], jsonb[], float8[], text[], jsonb[]"
+
+# Prepared once per connection: the batch arrives as one array per column,
+# so every flush is a single EXECUTE against an already-planned INSERT.
+# JSON columns arrive pre-serialized as text and are parsed server-side.
+PREPARE_SQL = f"""
+PREPARE driftwatch_ins ({COLUMN_TYPES}) AS
+INSERT INTO inference_events ({COLUMNS})
+SELECT * FROM unnest($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+"""
+EXECUTE_SQL = "EXECUTE driftwatch_ins ({})".format(
+    ", ".join(f"%s::{t}" for t in COLUMN_TYPES.split(", "))
+)
+
+def _nan_to_none(val: Any) -> Any:
+    """orjson fallback for types it can't encode: NaN-likes (e.g. Decimal) -> null, else str."""
+    try:
+        if math.isnan(val):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(val)
+
+def _dumps(d: Dict[str, Any]) -> str:
+    """Serialize a features/segment dict to JSON text, NaN/Inf as null."""
+    return orjson.dumps(d, default=_nan_to_none, option=JSON_OPTIONS).decode("utf-8")
+
+def _copy_field(val: Any) -> str:
+    """Encode one value for COPY text format (NULL is \\N)."""
+    if val is None:
+        return "\\N"
+    return (str(val).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
 
 class DriftWatchClient:
     def __init__(self):
@@ -26,15 +74,20 @@ class DriftWatchClient:
         
         # Buffer configs
         try:
-            self.batch_size = int(os.getenv("DRIFTWATCH_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+            self.batch_size = max(1, int(os.getenv("DRIFTWATCH_BATCH_SIZE", DEFAULT_BATCH_SIZE)))
             self.flush_seconds = int(os.getenv("DRIFTWATCH_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+            self.flush_bytes = int(os.getenv("DRIFTWATCH_FLUSH_BYTES", DEFAULT_FLUSH_BYTES))
         except ValueError:
             self.batch_size = DEFAULT_BATCH_SIZE
             self.flush_seconds = DEFAULT_FLUSH_SECONDS
+            self.flush_bytes = DEFAULT_FLUSH_BYTES
 
         # State
-        self.buffer = deque(maxlen=MAX_BUFFER)
-        self.last_flush_time = time.time()
+        # log_inference only enqueues; the worker thread owns the DB connection
+        self._queue = queue.Queue(maxsize=MAX_BUFFER)
+        self._worker = None
+        self.last_flush_time = time.monotonic()  # Monotonic: immune to wall-clock steps
+        self._conn = None  # Long-lived, opened lazily on first flush
         
         # Counters
         self.dropped_events = 0
@@ -46,9 +99,33 @@ class DriftWatchClient:
             self.enabled = False
 
         if self.enabled:
-            logger.info("DriftWatchClient initialized. Batch=%d, Flush=%ds", 
-                        self.batch_size, self.flush_seconds)
+            logger.info("DriftWatchClient initialized. Batch=%d, Flush=%ds, FlushBytes=%d",
+                        self.batch_size, self.flush_seconds, self.flush_bytes)
+            self._worker = threading.Thread(target=self._drain_loop, name="driftwatch-flush", daemon=True)
+            self._worker.start()
     
+    def _get_conn(self):
+        """Return the persistent connection, reconnecting if it was closed."""
+        if self._conn is not None and self._conn.closed == 0:
+            return self._conn
+        conn = psycopg2.connect(self.dsn, connect_timeout=CONNECT_TIMEOUT)
+        with conn.cursor() as cur:
+            # Session-scoped (not per transaction): set once here instead of on every write
+            cur.execute(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'")
+            cur.execute(PREPARE_SQL)
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def _reset_conn(self):
+        """Drop the current connection so the next attempt reconnects."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+        self._conn = None
+
     def _sanitize(self, val: Any) -> Any:
         """Sanitize numeric values: NaN/Inf -> None."""
         if val is None:
@@ -58,7 +135,7 @@ class DriftWatchClient:
                 return None
         return val
 
-    def log_inference(
+    def _build_event(
         self,
         model_id: str,
         model_version: str,
@@ -70,89 +147,236 @@ class DriftWatchClient:
         features_json: Dict[str, Any],
         segment_json: Dict[str, Any],
         request_id: Optional[str] = None
-    ):
-        if not self.enabled:
-            return
+    ) -> Optional[tuple]:
+        """Sanitize and serialize one event into a queue row; None if it must be dropped."""
+        # Serialize once here so the worker only ships text; NaN/Inf become null
+        try:
+            features_str = _dumps(features_json)
+            segment_str = _dumps(segment_json)
+        except orjson.JSONEncodeError as e:
+            # e.g. integers beyond 64 bits or circular references
+            logger.warning(f"DriftWatch dropping event with non-JSON-compliant payload: {e}")
+            self.dropped_events += 1
+            return None
 
-        # Sanitize features and segment numbers
-        clean_features = {k: self._sanitize(v) for k, v in features_json.items()}
-        clean_segment = {k: self._sanitize(v) for k, v in segment_json.items()}
+        # Whole milliseconds here, so the COPY and INSERT paths accept the same values
+        # (the INSERT's ::int cast would round 12.5, COPY would reject it)
+        try:
+            latency_ms = None if latency_ms is None else round(float(latency_ms))
+        except (TypeError, ValueError, OverflowError):
+            logger.warning(f"DriftWatch dropping event with invalid latency_ms: {latency_ms!r}")
+            self.dropped_events += 1
+            return None
 
-        event = (
+        return (
             ts,
             model_id,
             model_version,
             request_id,
             pred_type,
             latency_ms,
-            Json(clean_features),
+            features_str,
             self._sanitize(y_pred_num),
             y_pred_text,
-            Json(clean_segment)
+            segment_str
         )
-        
-        # Add to buffer (auto-drops oldest if full per deque maxlen)
-        if len(self.buffer) == MAX_BUFFER:
+
+    def _enqueue(self, event: tuple):
+        # Hand off to the worker; never block the caller on a full queue
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
             self.dropped_events += 1
-            
-        self.buffer.append(event)
-        
-        # Check for flush
-        if (len(self.buffer) >= self.batch_size) or \
-           ((time.time() - self.last_flush_time) >= self.flush_seconds):
-            self.flush()
 
-    def flush(self):
-        if not self.enabled or not self.buffer:
+    def log_inference(
+        self,
+        model_id: str,
+        model_version: str,
+        ts: datetime,
+        pred_type: str,
+        y_pred_num: Optional[float],
+        y_pred_text: Optional[str],
+        latency_ms: Optional[int],
+        features_json: Dict[str, Any],
+        segment_json: Dict[str, Any],
+        request_id: Optional[str] = None
+    ):
+        if not self.enabled:
             return
 
-        batch = []
-        # Pop a batch
-        while self.buffer and len(batch) < self.batch_size:
-            batch.append(self.buffer.popleft())
-            
-        if not batch:
+        event = self._build_event(
+            model_id, model_version, ts, pred_type, y_pred_num, y_pred_text,
+            latency_ms, features_json, segment_json, request_id
+        )
+        if event is not None:
+            self._enqueue(event)
+
+    def log_inference_bulk(self, events: List[Dict[str, Any]]):
+        """Log many events at once; each dict holds log_inference keyword arguments."""
+        if not self.enabled:
             return
-            
+
+        for kwargs in events:
+            event = self._build_event(**kwargs)
+            if event is not None:
+                self._enqueue(event)
+
+    def _flush_copy(self, cur, batch):
+        """Stream a large batch through COPY ... FROM STDIN (text format)."""
+        buf = io.StringIO()
+        for row in batch:
+            # str() of a datetime is ISO 8601 too, and a string ts passes through as the INSERT takes it
+            buf.write("\t".join(map(_copy_field, row)))
+            buf.write("\n")
+        buf.seek(0)
+        cur.copy_expert(f"COPY inference_events ({COLUMNS}) FROM STDIN", buf)
+
+    def _row_bytes(self, row: tuple) -> int:
+        """Cheap size estimate of a queued row: its JSON text plus a fixed overhead."""
+        return len(row[6]) + len(row[9]) + ROW_OVERHEAD_BYTES
+
+    def _collect_batch(self, block: bool = True):
+        """
+        Block until a size/bytes/time trigger fires or a control item arrives.
+        With block, first wait for an event however long that takes, so an idle
+        worker sleeps rather than spinning on a zero flush interval.
+        Returns (batch, control) where control is None, _STOP or a flush Event.
+        """
+        batch = []
+        nbytes = 0
+        if block:
+            item = self._queue.get()
+            if not isinstance(item, tuple):
+                return batch, item
+            batch.append(item)
+            nbytes += self._row_bytes(item)
+
+        # flush_seconds <= 0: nothing to wait for, write what is queued right away
+        while len(batch) < self.batch_size and nbytes < self.flush_bytes:
+            wait = self.flush_seconds - (time.monotonic() - self.last_flush_time)
+            if wait <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                break
+            if not isinstance(item, tuple):
+                return batch, item
+            batch.append(item)
+            nbytes += self._row_bytes(item)
+
+        # Take any backlog already queued so a burst goes out in one write (COPY when large),
+        # still capped by the byte threshold so wide payloads don't build one huge statement
+        while len(batch) < MAX_BUFFER and nbytes < self.flush_bytes:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, tuple):
+                return batch, item
+            batch.append(item)
+            nbytes += self._row_bytes(item)
+        return batch, None
+
+    def _drain_loop(self):
+        """Worker thread: pull events off the queue and write them in batches."""
+        pending = []  # Rows from a failed write, retried ahead of newer events
+        while True:
+            # Held-back rows are retried on the flush timer even if nothing new arrives
+            batch, control = self._collect_batch(block=not pending)
+            batch = pending + batch
+            pending = []
+            if batch:
+                try:
+                    if not self._write_batch(batch):
+                        pending = self._keep_failed(batch)
+                except psycopg2.Error as e:
+                    # Rejected rows (CHECK/NOT NULL violation, bad JSON text): would fail again
+                    logger.error("DriftWatch batch of %d events rejected: %s Dropping it.", len(batch), e)
+                    self._reset_conn()
+                    self.flush_failures += 1
+                    self.dropped_events += len(batch)
+                except Exception:
+                    # e.g. a value psycopg2 can't adapt; keep the worker alive for later batches
+                    logger.exception("DriftWatch failed to write %d events. Dropping them.", len(batch))
+                    self._reset_conn()
+                    self.flush_failures += 1
+                    self.dropped_events += len(batch)
+            self.last_flush_time = time.monotonic()
+
+            if control is _STOP:
+                if pending:
+                    logger.error("DriftWatch closing with %d unwritten events. Dropping them.", len(pending))
+                    self.dropped_events += len(pending)
+                self._reset_conn()
+                return
+            if control is not None:
+                control.set()  # Wake the flush() caller
+
+    def _write_batch(self, batch):
+        """
+        Write one batch in a single transaction, retrying on transient errors.
+        Returns False once retries run out; other errors are raised.
+        """
         success = False
-        wait = 0.5
+        wait = RETRY_BASE_WAIT
+        # Bound total time spent on one batch so the queue keeps draining during an outage
+        start = time.monotonic()
+        budget = max(2 * self.flush_seconds, RETRY_MAX_WAIT)
         
         # Retry loop
         for attempt in range(MAX_RETRIES):
             try:
-                with psycopg2.connect(self.dsn, connect_timeout=CONNECT_TIMEOUT) as conn:
-                    with conn.cursor() as cur:
-                        # Transaction-scoped timeout
-                        cur.execute(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'")
-                        
-                        sql = """
-                        INSERT INTO inference_events 
-                        (ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """
-                        cur.executemany(sql, batch)
-                    conn.commit()
+                conn = self._get_conn()
+                with conn.cursor() as cur:
+                    if len(batch) >= COPY_THRESHOLD:
+                        self._flush_copy(cur, batch)
+                    else:
+                        # Transpose rows into one array per column for the prepared INSERT
+                        cur.execute(EXECUTE_SQL, [list(col) for col in zip(*batch)])
+                conn.commit()
                 
                 success = True
                 self.insert_success += len(batch)
-                self.last_flush_time = time.time()
                 break  # Success
                 
-            except (psycopg2.Error, OSError) as e:
+            except TRANSIENT_ERRORS as e:
                 logger.warning(f"DriftWatch flush attempt {attempt+1}/{MAX_RETRIES} failed: {e}")
+                self._reset_conn()
                 if attempt < MAX_RETRIES - 1:
+                    # Decorrelated jitter: spreads retries out instead of doubling in lockstep
+                    wait = min(RETRY_MAX_WAIT, random.uniform(RETRY_BASE_WAIT, wait * 3))
+                    if time.monotonic() - start + wait > budget:
+                        logger.warning("DriftWatch flush retry budget of %.1fs exhausted.", budget)
+                        break
                     time.sleep(wait)
-                    wait *= 2
         
         if not success:
             self.flush_failures += 1
-            logger.error("DriftWatch flush failed after retries. Dropping batch.")
-            # Note: Batch is already popped from buffer, so it is dropped effectively.
+            logger.error("DriftWatch flush failed after retries. Keeping batch for the next flush.")
+        return success
+
+    def _keep_failed(self, batch):
+        """
+        Hold a failed batch for the next write, within MAX_BUFFER together with the queue.
+        The newest rows are kept; overflow counts as dropped.
+        """
+        room = max(MAX_BUFFER - self._queue.qsize(), 0)
+        kept = batch[-room:] if room else []
+        self.dropped_events += len(batch) - len(kept)
+        return kept
+
+    def flush(self):
+        """Block until every event logged so far has been written (or held back after a failed write)."""
+        if not self.enabled or not self._worker.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
 
     def close(self):
-        """Force flush remaining events on exit."""
-        if self.enabled:
-            logger.info("DriftWatch closing. Flushing remaining %d events...", len(self.buffer))
-            # Flush everything in batches
-            while self.buffer:
-                self.flush()
+        """Force flush remaining events and stop the worker on exit."""
+        if self.enabled and self._worker.is_alive():
+            logger.info("DriftWatch closing. Flushing remaining %d events...", self._queue.qsize())
+            self._queue.put(_STOP)
+            self._worker.join()
@@ -6,6 +6,7 @@ import random
 import logging
 import pytz
 import math
+import numpy as np
 
 from app.driftwatch_client import DriftWatchClient
 
@@ -18,28 +19,40 @@ class MockAPI:
     def __init__(self):
         self.base_url = os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets")
 
+# Mock feature name -> uniform sampling range
+FEATURE_RANGES = {
+    "sigma20_pct": (0.1, 0.5),
+    "price_change_pct": (-0.02, 0.02),
+    "ret5": (-0.01, 0.01),
+    "vol20": (0.1, 0.4),
+    "MACDh_12_26_9": (-0.5, 0.5),
+    "BBM_20_2.0": (0.9, 1.1),
+    "price_change_pct_lag2": (-0.02, 0.02),
+    "price_change_pct_lag3": (-0.02, 0.02),
+    "MACDh_12_26_9_lag2": (-0.5, 0.5),
+    "MACDh_12_26_9_lag3": (-0.5, 0.5),
+    "BBM_20_2.0_lag2": (0.9, 1.1),
+    "BBM_20_2.0_lag3": (0.9, 1.1),
+}
+FEATURE_LOW = np.array([lo for lo, _ in FEATURE_RANGES.values()])
+FEATURE_HIGH = np.array([hi for _, hi in FEATURE_RANGES.values()])
+RNG = np.random.default_rng()
+
 def now_ny():
     return datetime.datetime.now(TZ_NY)
 
-def predict_block_signal(api, sym):
+def draw_block_features(n_symbols):
+    # One row per symbol, columns in FEATURE_RANGES order
+    return RNG.uniform(FEATURE_LOW, FEATURE_HIGH, size=(n_symbols, len(FEATURE_RANGES)))
+
+def predict_block_signal(api, sym, feat_row=None):
     # Simulating signal generation
     # MUST return 'feat_last' as per requirements
     
-    # Generate random features
-    feat_last = {
-        "sigma20_pct": random.uniform(0.1, 0.5),
-        "price_change_pct": random.uniform(-0.02, 0.02),
-        "ret5": random.uniform(-0.01, 0.01),
-        "vol20": random.uniform(0.1, 0.4),
-        "MACDh_12_26_9": random.uniform(-0.5, 0.5),
-        "BBM_20_2.0": random.uniform(0.9, 1.1),
-        "price_change_pct_lag2": random.uniform(-0.02, 0.02),
-        "price_change_pct_lag3": random.uniform(-0.02, 0.02),
-        "MACDh_12_26_9_lag2": random.uniform(-0.5, 0.5),
-        "MACDh_12_26_9_lag3": random.uniform(-0.5, 0.5),
-        "BBM_20_2.0_lag2": random.uniform(0.9, 1.1),
-        "BBM_20_2.0_lag3": random.uniform(0.9, 1.1),
-    }
+    # Features are normally pre-drawn for the whole block; draw a single row otherwise
+    if feat_row is None:
+        feat_row = draw_block_features(1)[0]
+    feat_last = dict(zip(FEATURE_RANGES, feat_row.tolist()))
 
     return {
         "pred_pct": random.uniform(-0.01, 0.01),
@@ -69,12 +82,25 @@ def run_session(api):
             block_start = now_ny()
             logger.info(f"Starting Block {block_i} at {block_start}")
             
-            for sym in symbols:
+            # Draw every symbol's mock features in one call
+            block_feats = draw_block_features(len(symbols))
+            
+            # Segment Mapping: everything but the symbol is fixed for the block
+            base_url = api.base_url
+            env = "paper" if "paper" in base_url.lower() else "live"
+            base_segment = {
+                "timeframe": "1h",
+                "env": env,
+                "session": "regular",
+                "block_id": block_start.strftime("%Y-%m-%dT%H:%M:%S%z")
+            }
+            
+            for sym_i, sym in enumerate(symbols):
                 # 2. Start Timer
                 t0 = time.perf_counter()
                 
                 # 3. Predict (returns feat_last)
-                sig = predict_block_signal(api, sym)
+                sig = predict_block_signal(api, sym, block_feats[sym_i])
                 
                 # Mock state variables
                 px = 150.0 + random.uniform(-1, 1)
@@ -111,17 +137,7 @@ def run_session(api):
                     "target_frac": target_frac
                 }
                 
-                # Segment Mapping
-                base_url = api.base_url
-                env = "paper" if "paper" in base_url.lower() else "live"
-                
-                segment_json = {
-                    "sym": sym,
-                    "timeframe": "1h",
-                    "env": env,
-                    "session": "regular",
-                    "block_id": block_start.strftime("%Y-%m-%dT%H:%M:%S%z")
-                }
+                segment_json = {"sym": sym, **base_segment}
                 
                 dw.log_inference(
                     model_id="trading_ensemble_ret_1h",
@@ -1,7 +1,7 @@
 import os
 import click
 import psycopg2
-import pandas as pd
+from psycopg2 import sql
 from tabulate import tabulate
 import datetime
 
@@ -12,6 +12,36 @@ def get_db_connection():
         raise ValueError("DATABASE_URL env var not set")
     return psycopg2.connect(DATABASE_URL)
 
+def fetch_trend(cur, metrics, params, days):
+    """
+    One row per day (latest `days` days with any metric), one column per metric.
+    Metrics with no values in the window are left out. Returns (headers, rows).
+    """
+    columns = sql.SQL(", ").join(
+        sql.SQL("max(metric_value) FILTER (WHERE metric_name = {}) AS {}").format(
+            sql.Literal(m), sql.Identifier(m)
+        )
+        for m in metrics
+    )
+    query = sql.SQL("""
+        SELECT * FROM (
+            SELECT day, {columns}
+            FROM metrics_daily
+            WHERE model_id = %s AND model_version = %s
+              AND day >= %s AND day <= %s
+            GROUP BY day
+            ORDER BY day DESC
+            LIMIT %s
+        ) t
+        ORDER BY day ASC
+    """).format(columns=columns)
+    cur.execute(query, (*params, days))
+    rows = cur.fetchall()
+
+    keep = [0] + [i for i in range(1, len(metrics) + 1) if any(r[i] is not None for r in rows)]
+    headers = ['day'] + metrics
+    return [headers[i] for i in keep], [[r[i] for i in keep] for r in rows]
+
 @click.command()
 @click.option('--model_id', required=True, help='Model ID')
 @click.option('--model_version', required=True, help='Model Version')
@@ -27,47 +57,72 @@ def report(model_id, model_version, days):
     click.echo(f"\n=== ML Health Report: {model_id} v{model_version} ===")
     click.echo(f"Period: {start_date} to {end_date}\n")
 
-    # Fetch Metrics
-    query = """
-        SELECT day, metric_name, metric_value 
-        FROM metrics_daily 
-        WHERE model_id = %s AND model_version = %s 
-          AND day >= %s AND day <= %s
-        ORDER BY day ASC
-    """
-    df = pd.read_sql(query, conn, params=(model_id, model_version, start_date, end_date))
+    params = (model_id, model_version, start_date, end_date)
+    with conn.cursor() as cur:
+        # --- 1. Latency Trend ---
+        reliability_headers, reliability_rows = fetch_trend(
+            cur, ['p50_latency_ms', 'p95_latency_ms', 'count_inferences'], params, days
+        )
+        if not reliability_rows:
+            conn.close()
+            click.echo("No metrics found for this period.")
+            return
+        latest_day = reliability_rows[-1][0]
+
+        # --- 2. Drift (PSI) ---
+        cur.execute(
+            """
+            SELECT metric_name, metric_value
+            FROM metrics_daily
+            WHERE model_id = %s AND model_version = %s AND day = %s
+              AND metric_name LIKE 'psi\\_\\_%%'
+            ORDER BY metric_value DESC NULLS LAST
+            LIMIT 5
+            """,
+            (model_id, model_version, latest_day)
+        )
+        top_psi = cur.fetchall()
+
+        # --- 3. Optional Performance ---
+        perf_headers, perf_rows = fetch_trend(cur, ['mae', 'f1'], params, days)
+
+        # --- 4. Health inputs: latest-day PSI over threshold and the p95 baseline ---
+        cur.execute(
+            """
+            SELECT metric_name, metric_value
+            FROM metrics_daily
+            WHERE model_id = %s AND model_version = %s AND day = %s
+              AND metric_name LIKE 'psi\\_\\_%%' AND metric_value > 0.2
+            ORDER BY metric_name
+            """,
+            (model_id, model_version, latest_day)
+        )
+        psi_issues = cur.fetchall()
+
+        cur.execute(
+            """
+            SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY metric_value)
+            FROM metrics_daily
+            WHERE model_id = %s AND model_version = %s
+              AND day >= %s AND day <= %s
+              AND metric_name = 'p95_latency_ms'
+            """,
+            params
+        )
+        history_p95 = cur.fetchone()[0]
     conn.close()
-    
-    if len(df) == 0:
-        click.echo("No metrics found for this period.")
-        return
 
-    # Pivot for easy access
-    # metric_name becomes columns
-    df_pivot = df.pivot(index='day', columns='metric_name', values='metric_value')
-    
-    # --- 1. Latency Trend ---
     click.echo("--- Reliability (Latency) ---")
-    latency_cols = ['p50_latency_ms', 'p95_latency_ms', 'count_inferences']
-    cols_to_show = [c for c in latency_cols if c in df_pivot.columns]
-    if cols_to_show:
-        print(tabulate(df_pivot[cols_to_show].tail(days), headers='keys', tablefmt='simple'))
+    if len(reliability_headers) > 1:
+        print(tabulate(reliability_rows, headers=reliability_headers, tablefmt='simple'))
     else:
         click.echo("No latency metrics available.")
     click.echo("")
 
-    # --- 2. Drift (PSI) ---
     click.echo("--- Top Drift (PSI) ---")
-    # Filter columns starting with psi__
-    psi_cols = [c for c in df_pivot.columns if c.startswith('psi__')]
-    
-    if psi_cols:
-        # Get latest day values
-        latest_day = df_pivot.index.max()
-        latest_psi = df_pivot.loc[latest_day, psi_cols].sort_values(ascending=False).head(5)
-        
+    if top_psi:
         drift_data = []
-        for col, val in latest_psi.items():
+        for col, val in top_psi:
             feature = col.replace("psi__", "")
             severity = "OK"
             if val > 0.3: severity = "CRITICAL"
@@ -79,40 +134,32 @@ def report(model_id, model_version, days):
         click.echo("No PSI metrics available.")
     click.echo("")
     
-    # --- 3. Optional Performance ---
     click.echo("--- Performance ---")
-    perf_cols = [c for c in ['mae', 'f1'] if c in df_pivot.columns]
-    if perf_cols:
-        print(tabulate(df_pivot[perf_cols].tail(days), headers='keys', tablefmt='simple'))
+    if len(perf_headers) > 1:
+        print(tabulate(perf_rows, headers=perf_headers, tablefmt='simple'))
     else:
         click.echo("No performance metrics available (require labels).")
     click.echo("")
 
     # --- 4. Health Summary ---
     click.echo("--- Health Summary (Latest Day) ---")
-    latest_day = df_pivot.index.max()
-    row = df_pivot.loc[latest_day]
-    
     issues = []
     
     # PSI Check
-    for col in psi_cols:
-        val = row.get(col, 0)
+    for col, val in psi_issues:
         if val > 0.3:
             issues.append(f"CRITICAL: {col} = {val:.3f} (> 0.3)")
-        elif val > 0.2:
+        else:
             issues.append(f"WARN: {col} = {val:.3f} (> 0.2)")
             
     # Latency Check
     # Rule: p95 > 2x median(p95 last 7 days) -> CRITICAL
     # Rule: p95 > 1.5x median(p95 last 7 days) -> WARN
-    if 'p95_latency_ms' in df_pivot.columns:
-        current_p95 = row['p95_latency_ms']
-        # Calculate median of p95 over last 7 days EXCLUDING today (if possible, or typically including)
-        # Prompt says "median(p95 over last 7 days)". Usually means baseline history. 
-        # Let's take the rolling window of the data we pulled.
-        history_p95 = df_pivot['p95_latency_ms'].median() # Simple median of current view
-        
+    # Baseline is the median of p95 over the whole reporting window (including today)
+    current_p95 = None
+    if 'p95_latency_ms' in reliability_headers:
+        current_p95 = reliability_rows[-1][reliability_headers.index('p95_latency_ms')]
+    if current_p95 is not None and history_p95 is not None:
         if current_p95 > 2 * history_p95 and history_p95 > 0:
              issues.append(f"CRITICAL: p95 latency {current_p95} is > 2x baseline {history_p95}")
         elif current_p95 > 1.5 * history_p95 and history_p95 > 0:
@@ -1,48 +1,49 @@
 import datetime
-import random
 import numpy as np
 from ml_observability_mvp.sdk import MLOpsClient
 from ml_observability_mvp.jobs.compute_daily_metrics import run_job
 
+RNG = np.random.default_rng()
+
 def generate_traffic(client, model_id, date, count=200, drift=False):
     print(f"Generating {count} events for {date} (Drift={drift})...")
     
-    for _ in range(count):
-        # Base features
-        age = int(np.random.normal(35, 10))
-        income = float(np.random.normal(50000, 15000))
-        credit_score = int(np.random.normal(700, 50))
-        
-        # Inject Drift if requested
-        if drift:
-            # Shift age significantly
-            age = int(np.random.normal(55, 10))
-            # Shift income
-            income = float(np.random.normal(75000, 20000))
-
-        features = {
-            "age": age,
-            "income": income,
-            "credit_score": credit_score
+    # Draw every event's values in one vectorized call each
+    if drift:
+        # Inject Drift: shift age significantly, shift income
+        ages = RNG.normal(55, 10, count)
+        incomes = RNG.normal(75000, 20000, count)
+    else:
+        ages = RNG.normal(35, 10, count)
+        incomes = RNG.normal(50000, 15000, count)
+    credit_scores = RNG.normal(700, 50, count)
+    y_preds = RNG.random(count) # Dummy probability
+    latencies = RNG.integers(15, 121, count) # Realistic latency
+    # Random hour/minute within that specific date
+    minutes = RNG.integers(0, 24 * 60, count)
+    day_start = datetime.datetime.combine(date, datetime.time.min, tzinfo=datetime.timezone.utc)
+    
+    events = [
+        {
+            "model_id": model_id,
+            "model_version": "1.0.0",
+            "features": {
+                "age": int(age),
+                "income": float(income),
+                "credit_score": int(credit_score)
+            },
+            "pred_type": "classification",
+            "y_pred_num": float(y_pred),
+            "latency_ms": int(latency),
+            "timestamp": day_start + datetime.timedelta(minutes=int(minute)),
+            "privacy_mode": "raw" # Explicitly use raw for MVP demo
         }
-        
-        # Create Timestamp for that specific date
-        # Random hour/minute
-        dt = datetime.datetime.combine(date, datetime.datetime.min.time()) + \
-             datetime.timedelta(hours=random.randint(0, 23), minutes=random.randint(0, 59))
-        dt = dt.replace(tzinfo=datetime.timezone.utc)
-        
-        # Log Inference
-        client.log_inference(
-            model_id=model_id,
-            model_version="1.0.0",
-            features=features,
-            pred_type="classification",
-            y_pred_num=random.random(), # Dummy probability
-            latency_ms=random.randint(15, 120), # Realistic latency
-            timestamp=dt,
-            privacy_mode="raw" # Explicitly use raw for MVP demo
-        )
+        for age, income, credit_score, y_pred, latency, minute
+        in zip(ages, incomes, credit_scores, y_preds, latencies, minutes)
+    ]
+    
+    # Log Inferences in one round-trip
+    client.log_inference_bulk(events)
 
 def run_demo():
     client = MLOpsClient()
@@ -1,10 +1,13 @@
+import io
 import os
 import datetime
 import pandas as pd
 import numpy as np
+import orjson
 import psycopg2
-from psycopg2.extras import execute_values
-from typing import List, Tuple, Dict, Any
+from psycopg2 import sql
+from psycopg2.extras import execute_values, register_default_jsonb
+from typing import List, Tuple, Dict, Any, Union
 
 # Configurations
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -13,42 +16,70 @@ DRIFT_Features = os.getenv("MODEL_DRIFT_FEATURES", "").split(",")
 def get_db_connection():
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL env var not set")
-    return psycopg2.connect(DATABASE_URL)
+    conn = psycopg2.connect(DATABASE_URL)
+    # features_json rows are decoded in bulk when no drift whitelist is set
+    register_default_jsonb(conn_or_curs=conn, loads=orjson.loads)
+    return conn
 
-def compute_psi(expected: pd.Series, actual: pd.Series, buckets: int = 10) -> float:
+def compute_psi(expected: Union[pd.Series, np.ndarray], actual: Union[pd.Series, np.ndarray], buckets: int = 10) -> float:
     """
     Compute Population Stability Index (PSI) for a single feature.
     Uses quantile binning from expected (baseline) to apply to actual.
+    Inputs must be NaN-free.
     """
-    if len(expected) == 0 or len(actual) == 0:
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    if len(e) == 0 or len(a) == 0:
         return 0.0
 
-    # Define bins based on expected distribution (Baselne)
-    try:
-        # qcut handles quantiles. duplicates='drop' merges bins if many values are same (e.g. 0)
-        _, bins = pd.qcut(expected, q=buckets, retbins=True, duplicates='drop')
-    except ValueError:
+    # Define bins based on expected distribution (Baseline).
+    # np.unique merges duplicate edges (e.g. many values are 0), like qcut(duplicates='drop')
+    bins = np.unique(np.quantile(e, np.linspace(0, 1, buckets + 1)))
+    if len(bins) < 2:
         # Fallback if too few unique values
         return 0.0
-    
-    # Force bins to cover -inf/inf to include all new data
-    bins[0] = -np.inf
-    bins[-1] = np.inf
 
-    # Bin counts
-    expected_counts = pd.cut(expected, bins=bins).value_counts(sort=False)
-    actual_counts = pd.cut(actual, bins=bins).value_counts(sort=False)
+    # Outer edges are treated as -inf/inf to include all new data, so only inner edges matter.
+    # side='left' keeps bins right-closed, matching pd.cut.
+    inner = bins[1:-1]
+    expected_counts = np.bincount(np.searchsorted(inner, e, side='left'), minlength=len(bins) - 1)
+    actual_counts = np.bincount(np.searchsorted(inner, a, side='left'), minlength=len(bins) - 1)
 
     # Convert to proportions
-    expected_percents = (expected_counts / len(expected)).replace(0, 0.0001) # Avoid div/0 later
-    actual_percents = (actual_counts / len(actual)).replace(0, 0.0001)
+    expected_percents = expected_counts / len(e)
+    actual_percents = actual_counts / len(a)
+    expected_percents[expected_percents == 0] = 0.0001 # Avoid div/0 later
+    actual_percents[actual_percents == 0] = 0.0001
 
     # PSI formula: sum((Actual% - Expected%) * ln(Actual% / Expected%))
-    psi_values = (actual_percents - expected_percents) * np.log(actual_percents / expected_percents)
-    psi = psi_values.sum()
-    
+    psi = ((actual_percents - expected_percents) * np.log(actual_percents / expected_percents)).sum()
+
     return float(psi)
 
+def feature_select_sql(features: List[str]) -> sql.Composable:
+    """
+    SELECT-list extracting the given features from features_json as float8 columns.
+    Non-numeric values come back as NULL instead of failing the cast.
+    """
+    return sql.SQL(", ").join(
+        sql.SQL(
+            "CASE WHEN jsonb_typeof(features_json -> {key}) = 'number' "
+            "THEN (features_json ->> {key})::float8 END AS {alias}"
+        ).format(key=sql.Literal(feat), alias=sql.Identifier(feat))
+        for feat in features
+    )
+
+def copy_read(conn, query: sql.Composable, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Run a SELECT through COPY ... TO STDOUT and parse the CSV with pandas.
+    Avoids pd.read_sql building Python objects tuple by tuple.
+    """
+    with conn.cursor() as cur:
+        buf = io.StringIO()
+        cur.copy_expert(sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER)").format(query), buf)
+    buf.seek(0)
+    return pd.read_csv(buf, **read_csv_kwargs)
+
 def run_job(target_day_str: str = None):
     """
     Main job entrypoint.
@@ -64,9 +95,12 @@ def run_job(target_day_str: str = None):
     
     # 1. Get Models active on target day
     # We query raw events. In a bigger system, we'd query a registry or manifest.
+    # Day filters are half-open ts ranges rather than ts::date = %s, so they can use
+    # the btree indexes on ts (see schema.sql) instead of casting every row.
+    day_end = target_day + datetime.timedelta(days=1)
     with conn.cursor() as cur:
-        query = "SELECT DISTINCT model_id, model_version FROM inference_events WHERE ts::date = %s"
-        cur.execute(query, (target_day,))
+        query = "SELECT DISTINCT model_id, model_version FROM inference_events WHERE ts >= %s AND ts < %s"
+        cur.execute(query, (target_day, day_end))
         models = cur.fetchall()
 
     for model_id, model_version in models:
@@ -78,22 +112,54 @@ def run_job(target_day_str: str = None):
 
 def process_model_metrics(conn, model_id, model_version, target_day):
     metrics = []
+    # Index-friendly [target_day, day_end) range on ts, served by idx_inference_model_ts
+    day_end = target_day + datetime.timedelta(days=1)
+
+    # If DRIFT_Features env var is set, only those features are needed, and Postgres
+    # extracts them as typed columns. Else we fetch raw JSON and discover features in pandas.
+    drift_feats_config = [f.strip() for f in DRIFT_Features if f.strip()]
+    if drift_feats_config:
+        feature_cols = feature_select_sql(drift_feats_config)
+    else:
+        feature_cols = sql.Identifier("features_json")
+
+    def fetch_features(query, params):
+        # Values are inlined as literals, not passed as %s parameters: psycopg2 would
+        # read a '%' in a feature name (e.g. 'pct_%') as a placeholder
+        query = query.format(*map(sql.Literal, params), cols=feature_cols)
+        if drift_feats_config:
+            # Typed float columns: bulk COPY + read_csv beats read_sql's tuple-at-a-time fetch
+            return copy_read(conn, query, dtype={feat: np.float64 for feat in drift_feats_config})
+        # Raw JSON: psycopg2 decodes jsonb directly, cheaper than CSV text + json.loads
+        return pd.read_sql(query.as_string(conn), conn)
 
     # --- A. Data Fetching ---
-    
-    # Current Day Data
-    # Note: We are fetching Raw JSON features. 
-    query_current = """
-        SELECT features_json, latency_ms, pred_type, request_id, y_pred_num
+
+    # Reliability aggregates are computed where the data lives; latencies never leave Postgres.
+    # percentile_cont interpolates linearly, like pandas median()/quantile().
+    query_reliability = """
+        SELECT count(*),
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_ms),
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms)
         FROM inference_events
-        WHERE model_id = %s AND model_version = %s AND ts::date = %s
+        WHERE model_id = %s AND model_version = %s AND ts >= %s AND ts < %s
     """
-    df_current = pd.read_sql(query_current, conn, params=(model_id, model_version, target_day))
-    
-    if len(df_current) == 0:
+    with conn.cursor() as cur:
+        cur.execute(query_reliability, (model_id, model_version, target_day, day_end))
+        count_inferences, p50_latency, p95_latency = cur.fetchone()
+
+    if count_inferences == 0:
         print("  No data for current day. Skipping.")
         return
 
+    # Current Day Data (features only)
+    query_current = sql.SQL("""
+        SELECT {cols}
+        FROM inference_events
+        WHERE model_id = {} AND model_version = {} AND ts >= {} AND ts < {}
+    """)
+    df_current = fetch_features(query_current, (model_id, model_version, target_day, day_end))
+
     # Baseline Data (First 14 days of this model version)
     # We define baseline as "earliest 14 days available for this model version" 
     # OR simpler: "Window [TargetDay - 14, TargetDay - 1]"? 
@@ -108,90 +174,92 @@ def process_model_metrics(conn, model_id, model_version, target_day):
     # Baseline window = [min_date, min_date + 14 days]
     baseline_end = min_date + datetime.timedelta(days=14)
     
-    query_baseline = """
-        SELECT features_json
+    query_baseline = sql.SQL("""
+        SELECT {cols}
         FROM inference_events
-        WHERE model_id = %s AND model_version = %s 
-          AND ts::date >= %s AND ts::date < %s
+        WHERE model_id = {} AND model_version = {} 
+          AND ts >= {} AND ts < {}
         LIMIT 100000
-    """
-    df_baseline = pd.read_sql(query_baseline, conn, params=(model_id, model_version, min_date, baseline_end))
+    """)
+    df_baseline = fetch_features(query_baseline, (model_id, model_version, min_date, baseline_end))
 
     # --- B. Reliability Metrics ---
-    count_inferences = len(df_current)
-    p50_latency = float(df_current['latency_ms'].median()) if not df_current['latency_ms'].isnull().all() else 0.0
-    p95_latency = float(df_current['latency_ms'].quantile(0.95)) if not df_current['latency_ms'].isnull().all() else 0.0
-    
+    # Percentiles are NULL when every latency_ms is NULL
     metrics.append(('count_inferences', count_inferences))
-    metrics.append(('p50_latency_ms', p50_latency))
-    metrics.append(('p95_latency_ms', p95_latency))
+    metrics.append(('p50_latency_ms', p50_latency if p50_latency is not None else 0.0))
+    metrics.append(('p95_latency_ms', p95_latency if p95_latency is not None else 0.0))
 
     # --- C. Drift Metrics (PSI) ---
-    # Need to expand JSON features into columns
+    # Without a whitelist, need to expand JSON features into columns
     # Assuming flat JSON like {"age": 25, "income": 50000}
     
     # Skip PSI if sample size too small
     if len(df_baseline) < 200 or len(df_current) < 200:
         print(f"  Skipping Drift: Not enough samples (Baseline: {len(df_baseline)}, Current: {len(df_current)})")
     else:
-        # Parsing JSON columns
-        # In a real pipeline, we'd do this more efficiently or rely on summary sketches.
-        pdf_cur_features = pd.json_normalize(df_current['features_json'])
-        pdf_base_features = pd.json_normalize(df_baseline['features_json'])
+        if drift_feats_config:
+            # Already projected server-side; a feature that is never numeric arrives all-NULL
+            pdf_cur_features = df_current
+            pdf_base_features = df_baseline
+        else:
+            # Parsing JSON columns
+            pdf_cur_features = pd.json_normalize(df_current['features_json'])
+            pdf_base_features = pd.json_normalize(df_baseline['features_json'])
 
         # Filter to numeric features only (as per constraints)
-        # If DRIFT_Features env var is set, use that whitelist. Else verify numeric.
-        drift_feats_config = [f.strip() for f in DRIFT_Features if f.strip()]
-        
         feature_candidates = drift_feats_config if drift_feats_config else pdf_cur_features.columns
-        
-        for feat in feature_candidates:
-            if feat not in pdf_cur_features.columns or feat not in pdf_base_features.columns:
-                continue
-            
-            # Ensure numeric
-            if not pd.api.types.is_numeric_dtype(pdf_cur_features[feat]) or not pd.api.types.is_numeric_dtype(pdf_base_features[feat]):
-                continue
-                
-            psi_val = compute_psi(pdf_base_features[feat].dropna(), pdf_cur_features[feat].dropna())
-            metrics.append((f'psi__{feat}', psi_val))
+        numeric_feats = [
+            feat for feat in feature_candidates
+            if feat in pdf_cur_features.columns and feat in pdf_base_features.columns
+            and pd.api.types.is_numeric_dtype(pdf_cur_features[feat])
+            and pd.api.types.is_numeric_dtype(pdf_base_features[feat])
+            # All-NULL in either window means the feature has no numeric values to compare
+            and pdf_cur_features[feat].notna().any()
+            and pdf_base_features[feat].notna().any()
+        ]
+
+        if numeric_feats:
+            # One float64 matrix per window, column-major so each feature is a contiguous slice
+            base = np.asfortranarray(pdf_base_features[numeric_feats].to_numpy(dtype=np.float64))
+            cur = np.asfortranarray(pdf_cur_features[numeric_feats].to_numpy(dtype=np.float64))
+            for j, feat in enumerate(numeric_feats):
+                e, a = base[:, j], cur[:, j]
+                psi_val = compute_psi(e[~np.isnan(e)], a[~np.isnan(a)])
+                metrics.append((f'psi__{feat}', psi_val))
 
 
     # --- D. Performance Metrics (Conditional) ---
-    # Join labels
-    # We query label_events and join in memory for the MVP script or do separate lookup.
-    # Better to join in SQL.
+    # Join labels and aggregate in SQL: only one row of counts comes back.
+    # Binarization mirrors a threshold of 0.5 on y_pred_num and int truncation of y_true_num.
     query_perf = """
-        SELECT i.y_pred_num, l.y_true_num, i.pred_type
+        SELECT count(*) AS n,
+               min(i.pred_type) AS pred_type,
+               avg(abs(l.y_true_num - i.y_pred_num)) AS mae,
+               count(*) FILTER (WHERE i.y_pred_num >= 0.5 AND trunc(l.y_true_num) = 1) AS tp,
+               count(*) FILTER (WHERE i.y_pred_num >= 0.5 AND trunc(l.y_true_num) = 0) AS fp,
+               count(*) FILTER (WHERE (i.y_pred_num >= 0.5) IS NOT TRUE AND trunc(l.y_true_num) = 1) AS fn
         FROM inference_events i
         JOIN label_events l ON i.request_id = l.request_id
-        WHERE i.model_id = %s AND i.model_version = %s AND i.ts::date = %s
+        WHERE i.model_id = %s AND i.model_version = %s AND i.ts >= %s AND i.ts < %s
     """
-    df_perf = pd.read_sql(query_perf, conn, params=(model_id, model_version, target_day))
+    with conn.cursor() as cur:
+        cur.execute(query_perf, (model_id, model_version, target_day, day_end))
+        n_labels, pred_type, mae, tp, fp, fn = cur.fetchone()
     
-    if len(df_perf) >= 200:
-        # Determine task type from first row (assuming consistent)
-        pred_type = df_perf['pred_type'].iloc[0]
-        
+    if n_labels >= 200:
+        # Task type assumed consistent across the model version
         if pred_type == 'regression':
-            mae = (df_perf['y_true_num'] - df_perf['y_pred_num']).abs().mean()
-            metrics.append(('mae', float(mae)))
+            if mae is not None:
+                metrics.append(('mae', float(mae)))
         elif pred_type == 'classification':
             # F1 score for binary classification (threshold 0.5)
             # Assuming y_pred_num is probability of positive class (1)
-            y_pred_binary = (df_perf['y_pred_num'] >= 0.5).astype(int)
-            y_true_binary = (df_perf['y_true_num']).astype(int)
-            
-            tp = ((y_pred_binary == 1) & (y_true_binary == 1)).sum()
-            fp = ((y_pred_binary == 1) & (y_true_binary == 0)).sum()
-            fn = ((y_pred_binary == 0) & (y_true_binary == 1)).sum()
-            
             precision = tp / (tp + fp) if (tp + fp) > 0 else 0
             recall = tp / (tp + fn) if (tp + fn) > 0 else 0
             f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
             metrics.append(('f1', f1))
     else:
-        print(f"  Skipping Perf: Not enough labels ({len(df_perf)})")
+        print(f"  Skipping Perf: Not enough labels ({n_labels})")
 
     # --- E. Store Metrics ---
     if metrics:
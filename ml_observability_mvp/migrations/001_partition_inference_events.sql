@@ -0,0 +1,59 @@
+-- Optional migration: convert inference_events into a table partitioned by week on ts.
+--
+-- Each week's rows live in their own partition (inference_events_<ISO year>w<ISO week>),
+-- so index maintenance and autovacuum work on one small heap instead of an ever-growing
+-- one, and dropping old data is a DROP TABLE. Run once, in a maintenance window:
+--
+--     psql "$DATABASE_URL" -f migrations/001_partition_inference_events.sql
+--
+-- Partitions are created up to 4 weeks ahead. Schedule
+--     SELECT inference_events_create_partitions(now(), now() + interval '4 weeks');
+-- (e.g. daily, next to the metrics job) to keep creating them. Rows for weeks without a
+-- partition land in inference_events_default; create the partition before its week
+-- starts, since Postgres refuses to add one whose range already has rows in the default.
+--
+-- Clients can then write batches straight into the week's partition:
+--     MLOpsClient(partitioned=True)
+
+BEGIN;
+
+ALTER TABLE inference_events RENAME TO inference_events_unpartitioned;
+
+CREATE TABLE inference_events (
+    LIKE inference_events_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (ts);
+
+CREATE TABLE inference_events_default PARTITION OF inference_events DEFAULT;
+
+-- Weeks start Monday 00:00 UTC, matching the names MLOpsClient computes
+CREATE OR REPLACE FUNCTION inference_events_create_partitions(from_ts TIMESTAMPTZ, to_ts TIMESTAMPTZ)
+RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    week_start TIMESTAMPTZ := date_trunc('week', from_ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+BEGIN
+    WHILE week_start < to_ts LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF inference_events FOR VALUES FROM (%L) TO (%L)',
+            'inference_events_' || to_char(week_start AT TIME ZONE 'UTC', 'IYYY"w"IW'),
+            week_start,
+            week_start + interval '168 hours'  -- Not '7 days': that follows the session's DST shifts
+        );
+        week_start := week_start + interval '168 hours';
+    END LOOP;
+END
+$$;
+
+SELECT inference_events_create_partitions(
+    COALESCE((SELECT min(ts) FROM inference_events_unpartitioned), now()),
+    now() + interval '4 weeks'
+);
+
+INSERT INTO inference_events SELECT * FROM inference_events_unpartitioned;
+DROP TABLE inference_events_unpartitioned;
+
+-- Same indexes as schema.sql, now created on every partition
+CREATE INDEX IF NOT EXISTS idx_inference_model_ts ON inference_events (model_id, model_version, ts);
+CREATE INDEX IF NOT EXISTS idx_inference_ts ON inference_events (ts);
+CREATE INDEX IF NOT EXISTS idx_inference_request_id ON inference_events (request_id);
+
+COMMIT;
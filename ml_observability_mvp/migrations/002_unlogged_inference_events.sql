@@ -0,0 +1,52 @@
+-- Optional migration: stop WAL-logging inference_events.
+--
+-- Writes to an UNLOGGED table skip the write-ahead log, so ingest no longer waits on WAL
+-- flushes and writes far less I/O. The price: after a crash (not a clean shutdown) Postgres
+-- truncates the table, and it isn't replicated to standbys. Only run this if inference
+-- logs are telemetry you can afford to lose; label_events and the metrics tables stay
+-- logged. For a milder trade-off (lose at most the last few hundred ms of writes on a
+-- crash) use MLOpsClient(ingest_durability="async") instead.
+--
+--     psql "$DATABASE_URL" -f migrations/002_unlogged_inference_events.sql
+--
+-- Works on the plain table or after 001 (running 001 later recreates the table logged).
+-- On a partitioned table every partition is switched, and partitions created from now on
+-- by inference_events_create_partitions are UNLOGGED too.
+-- Undo with ALTER TABLE ... SET LOGGED on each table (this rewrites them into the WAL).
+
+BEGIN;
+
+DO $$
+DECLARE
+    part REGCLASS;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'inference_events'::regclass) <> 'p' THEN
+        ALTER TABLE inference_events SET UNLOGGED;
+        RETURN;
+    END IF;
+
+    FOR part IN SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'inference_events'::regclass LOOP
+        EXECUTE format('ALTER TABLE %s SET UNLOGGED', part);
+    END LOOP;
+
+    -- Same as in 001, but new weekly partitions are created UNLOGGED
+    CREATE OR REPLACE FUNCTION inference_events_create_partitions(from_ts TIMESTAMPTZ, to_ts TIMESTAMPTZ)
+    RETURNS void LANGUAGE plpgsql AS $fn$
+    DECLARE
+        week_start TIMESTAMPTZ := date_trunc('week', from_ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    BEGIN
+        WHILE week_start < to_ts LOOP
+            EXECUTE format(
+                'CREATE UNLOGGED TABLE IF NOT EXISTS %I PARTITION OF inference_events FOR VALUES FROM (%L) TO (%L)',
+                'inference_events_' || to_char(week_start AT TIME ZONE 'UTC', 'IYYY"w"IW'),
+                week_start,
+                week_start + interval '168 hours'
+            );
+            week_start := week_start + interval '168 hours';
+        END LOOP;
+    END
+    $fn$;
+END
+$$;
+
+COMMIT;
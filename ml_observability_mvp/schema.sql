@@ -3,6 +3,7 @@
 -- 1. Inference Events
 -- Stores raw inference telemetry. 
 -- In a real prod system, 'features_json' might store sketches, but here we allow raw for MVP demo.
+-- At high volume, migrations/001_partition_inference_events.sql partitions it by week.
 CREATE TABLE IF NOT EXISTS inference_events (
     ts TIMESTAMPTZ NOT NULL,
     model_id TEXT NOT NULL,
@@ -18,6 +19,8 @@ CREATE TABLE IF NOT EXISTS inference_events (
 );
 
 CREATE INDEX IF NOT EXISTS idx_inference_model_ts ON inference_events (model_id, model_version, ts);
+-- Serves the daily job's "which models were active on day X" range scan
+CREATE INDEX IF NOT EXISTS idx_inference_ts ON inference_events (ts);
 CREATE INDEX IF NOT EXISTS idx_inference_request_id ON inference_events (request_id);
 
 
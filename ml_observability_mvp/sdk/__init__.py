@@ -1,3 +1,10 @@
 from .client import MLOpsClient
 
-__all__ = ["MLOpsClient"]
+__all__ = ["MLOpsClient", "AsyncMLOpsClient"]
+
+def __getattr__(name):
+    # Imported on first access: it pulls in asyncio, which sync users never need
+    if name == "AsyncMLOpsClient":
+        from .async_client import AsyncMLOpsClient
+        return AsyncMLOpsClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
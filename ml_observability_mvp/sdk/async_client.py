@@ -0,0 +1,191 @@
+import os
+import asyncio
+import datetime
+from typing import Dict, List, Optional, Any
+import orjson
+
+from .client import (
+    CHECK_SCHEMA_SQL,
+    COUNT_INFERENCES_SQL,
+    ESTIMATE_INFERENCES_SQL,
+    _inference_row,
+    _ts_datetime,
+)
+
+INFERENCE_COLUMNS = [
+    "ts", "model_id", "model_version", "request_id", "pred_type",
+    "latency_ms", "features_json", "y_pred_num", "y_pred_text", "segment_json",
+]
+
+# asyncpg prepares and caches these per connection on first use
+INSERT_INFERENCE_SQL = """
+INSERT INTO inference_events
+(ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+"""
+INSERT_LABEL_SQL = """
+INSERT INTO label_events
+(ts_label, model_id, request_id, y_true_num, y_true_text)
+VALUES ($1, $2, $3, $4, $5)
+"""
+
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+
+def _asyncpg():
+    """
+    Import asyncpg on first use; it is an optional dependency.
+    """
+    try:
+        import asyncpg
+    except ImportError as e:
+        raise ImportError(
+            "AsyncMLOpsClient requires asyncpg: pip install 'ml_observability_mvp[async]'"
+        ) from e
+    return asyncpg
+
+def _encode_jsonb(value: str) -> bytes:
+    # Binary jsonb is a version byte followed by the JSON text, which
+    # _inference_row has already encoded; binary is what COPY needs
+    return b"\x01" + value.encode()
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+async def _init_conn(conn):
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", encoder=_encode_jsonb, decoder=_decode_jsonb, format="binary"
+    )
+
+def _db_row(row: tuple) -> tuple:
+    # asyncpg binds timestamptz from datetime only, and reads a naive one as local
+    # time; _ts_datetime makes it UTC like the other writers
+    return (_ts_datetime(row[0]),) + row[1:]
+
+class AsyncMLOpsClient:
+    """
+    asyncio counterpart of MLOpsClient for async services: calls await a pooled
+    asyncpg connection instead of blocking a thread. Writes happen in the call
+    itself (there is no background writer); use log_inference_bulk to batch.
+    """
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE
+    ):
+        self.dsn = database_url or os.getenv("DATABASE_URL")
+        if not self.dsn:
+            raise ValueError("DATABASE_URL must be set in environment or passed to constructor")
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None  # Created on first use, inside the running event loop
+        self._pool_lock = None  # Same; asyncio.Lock() binds to a loop on Python 3.9
+
+    async def _get_pool(self):
+        if self._pool is None:
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            # Concurrent first calls would otherwise each create (and leak) a pool
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await _asyncpg().create_pool(
+                        self.dsn, min_size=self.min_size, max_size=self.max_size, init=_init_conn
+                    )
+        return self._pool
+
+    async def log_inference(
+        self,
+        model_id: str,
+        model_version: str,
+        features: Dict[str, Any],
+        pred_type: str,
+        y_pred_num: Optional[float] = None,
+        y_pred_text: Optional[str] = None,
+        latency_ms: Optional[int] = 0,
+        request_id: Optional[str] = None,
+        timestamp: Optional[datetime.datetime] = None,
+        segment: Optional[Dict[str, Any]] = None,
+        privacy_mode: str = "summary"
+    ) -> str:
+        """
+        Log an inference event (same arguments as MLOpsClient.log_inference).
+        Returns its request_id once the row is stored.
+        """
+        row = _inference_row(
+            model_id, model_version, features, pred_type, y_pred_num, y_pred_text,
+            latency_ms, request_id, timestamp, segment, privacy_mode
+        )
+        pool = await self._get_pool()
+        await pool.execute(INSERT_INFERENCE_SQL, *_db_row(row))
+        return row[3]
+
+    async def log_inference_bulk(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Log many inference events with one binary COPY.
+
+        Args:
+            events: dicts of log_inference keyword arguments, one per event.
+        Returns:
+            The request_ids, in input order.
+        """
+        rows = [_inference_row(**event) for event in events]
+        if not rows:
+            return []
+
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                "inference_events", records=[_db_row(row) for row in rows], columns=INFERENCE_COLUMNS
+            )
+        return [row[3] for row in rows]
+
+    async def log_label(
+        self,
+        model_id: str,
+        request_id: str,
+        y_true_num: Optional[float] = None,
+        y_true_text: Optional[str] = None,
+        timestamp: Optional[datetime.datetime] = None
+    ):
+        """
+        Log a delayed label. A naive timestamp is taken as UTC.
+        """
+        ts = _ts_datetime(timestamp) if timestamp else datetime.datetime.now(datetime.timezone.utc)
+        pool = await self._get_pool()
+        await pool.execute(INSERT_LABEL_SQL, ts, model_id, request_id, y_true_num, y_true_text)
+
+    async def check_schema(self) -> bool:
+        """
+        Returns True if 'inference_events' table is found.
+        """
+        pool = await self._get_pool()
+        result = await pool.fetchval(CHECK_SCHEMA_SQL)
+        return result is not None and str(result) == 'inference_events'
+
+    async def get_inference_count(self, exact: bool = False) -> int:
+        """
+        Returns the total number of inference events logged.
+        See MLOpsClient.get_inference_count for what exact=False returns.
+        """
+        pool = await self._get_pool()
+        if not exact:
+            estimate = await pool.fetchval(ESTIMATE_INFERENCES_SQL)
+            if estimate >= 0:
+                return estimate
+        return await pool.fetchval(COUNT_INFERENCES_SQL)
+
+    async def close(self):
+        """
+        Close the connection pool.
+        """
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            self._pool_lock = None  # A later pool may live in another event loop
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
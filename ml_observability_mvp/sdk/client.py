@@ -1,19 +1,405 @@
+import io
 import os
-import json
+import sys
+import math
+import struct
+import time
 import datetime
-import uuid
-from typing import Dict, Optional, Any, Union
-import psycopg2
-from psycopg2.extras import Json
+import queue
+import atexit
+import logging
+import weakref
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Any, Union
+import orjson
+
+INSERT_INFERENCES_SQL = """
+INSERT INTO inference_events 
+(ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
+VALUES %s
+"""
+# JSON columns arrive as pre-encoded text
+INSERT_INFERENCES_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s::jsonb)"
+
+# Named statements, prepared once per connection on first use
+PREPARED_SQL = {
+    "inference_ins": """
+        PREPARE inference_ins (timestamptz, text, text, text, text, int, jsonb, float8, text, jsonb) AS
+        INSERT INTO inference_events
+        (ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+    """,
+    "label_ins": """
+        PREPARE label_ins (timestamptz, text, text, float8, text) AS
+        INSERT INTO label_events
+        (ts_label, model_id, request_id, y_true_num, y_true_text)
+        VALUES ($1, $2, $3, $4, $5)
+    """,
+}
+
+EXECUTE_INFERENCE_SQL = "EXECUTE inference_ins (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+EXECUTE_LABEL_SQL = "EXECUTE label_ins (%s, %s, %s, %s, %s)"
+
+CHECK_SCHEMA_SQL = "SELECT to_regclass('public.inference_events')"
+COUNT_INFERENCES_SQL = "SELECT count(*) FROM inference_events"
+# A partitioned parent has no reltuples of its own (-1); sum its partitions instead.
+# A never-analyzed partition (-1) counts as 0 only while it is empty; otherwise the
+# whole estimate is -1, so callers fall back to count(*) as for an unpartitioned table.
+ESTIMATE_INFERENCES_SQL = """
+SELECT CASE c.relkind
+    WHEN 'p' THEN (
+        SELECT CASE WHEN bool_or(p.reltuples < 0 AND pg_relation_size(p.oid) > 0) THEN -1
+                    ELSE coalesce(sum(greatest(p.reltuples, 0)), 0) END
+        FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhrelid
+        WHERE i.inhparent = c.oid
+    )
+    ELSE c.reltuples
+END::bigint
+FROM pg_class c
+WHERE c.oid = 'public.inference_events'::regclass
+"""
+EXISTING_TABLES_SQL = "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NOT NULL"
+
+COPY_INFERENCES_SQL = """
+COPY {table}
+(ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
+FROM STDIN WITH (FORMAT BINARY)
+"""
+
+_psycopg2 = None  # Imported on first connect, see _pg()
+
+def _pg():
+    """
+    Import psycopg2 (and libpq) on first use, so importing the SDK stays cheap
+    for code paths that never touch the database.
+    """
+    global _psycopg2
+    if _psycopg2 is None:
+        import psycopg2
+        import psycopg2.extras
+        import psycopg2.pool
+        _psycopg2 = psycopg2
+    return _psycopg2
+
+# Binary COPY framing: signature, flags, header-extension length ... one int16 -1 trailer
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+COPY_NULL = struct.pack(">i", -1)
+PG_EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+PG_EPOCH_UNIX_MICROS = 946_684_800_000_000  # PG_EPOCH as microseconds since UNIX_EPOCH
+
+# NaN/Infinity serialize as null; NumPy scalars/arrays and non-str keys are accepted
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000  # Past ~10k rows per statement the gains flatten and memory grows
+MAX_QUEUE = 100_000
+POOL_MIN_CONN = 2  # Kept open between calls: the writer thread plus one caller
+POOL_MAX_CONN = 8
+FLUSH_INTERVAL = 0.05  # Seconds a partial batch waits for more rows before it is written
+WRITE_METHODS = ("values", "copy")
+PRED_TYPES = ("classification", "regression", "other")  # CHECK constraint in schema.sql
+# Session settings per ingest_durability. "async": commits return before the WAL is flushed
+INGEST_DURABILITY_SQL = {
+    "sync": None,
+    "async": "SET synchronous_commit = off",
+}
+
+_STOP = object()  # Queue sentinel: drain and stop the writer
+
+logger = logging.getLogger(__name__)
+
+def _copy_text(val: Optional[str]) -> bytes:
+    if val is None:
+        return COPY_NULL
+    data = val.encode("utf-8")
+    return struct.pack(">i", len(data)) + data
+
+def _nan_to_none(val: Any) -> Any:
+    """
+    orjson fallback for types it can't encode: NaN-likes (e.g. Decimal('NaN')) become null.
+    """
+    try:
+        if math.isnan(val):
+            return None
+    except (TypeError, ValueError):
+        pass
+    raise TypeError(f"Type is not JSON serializable: {type(val).__name__}")
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize a features/segment payload to JSON text; NaN/Infinity become null at any depth.
+    """
+    return orjson.dumps(obj, default=_nan_to_none, option=JSON_OPTIONS).decode("utf-8")
+
+def _copy_jsonb(val: Optional[str]) -> bytes:
+    if val is None:
+        return COPY_NULL
+    data = b"\x01" + val.encode("utf-8")  # jsonb binary format version 1
+    return struct.pack(">i", len(data)) + data
+
+def _uuid7(now_ns: int) -> str:
+    """
+    Time-ordered UUIDv7 (RFC 9562) as canonical text: 48-bit Unix ms, then random bits.
+    Consecutive ids sort together, so inserts land at the right edge of the request_id index.
+    """
+    value = ((now_ns // 1_000_000) << 80) | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    h = "%032x" % value
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _ts_datetime(ts: Union[int, datetime.datetime]) -> datetime.datetime:
+    """
+    Row timestamps are a caller's datetime or time.time_ns() taken at log time.
+    Naive datetimes are taken as UTC, whichever path writes them (rather than the
+    session TimeZone on psycopg2 INSERTs, or local time in asyncpg).
+    """
+    if isinstance(ts, int):
+        return UNIX_EPOCH + datetime.timedelta(microseconds=ts // 1000)
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=datetime.timezone.utc)
+    return ts
+
+def _partition_for(ts: Union[int, datetime.datetime]) -> str:
+    """
+    Name of the weekly inference_events partition holding ts (see migrations/001):
+    ISO year and week of the UTC timestamp, e.g. inference_events_2025w03.
+    """
+    year, week, _ = _ts_datetime(ts).astimezone(datetime.timezone.utc).isocalendar()
+    return f"inference_events_{year}w{week:02d}"
+
+def _copy_timestamptz(ts: Union[int, datetime.datetime]) -> bytes:
+    if isinstance(ts, int):
+        # Nanoseconds since the UNIX epoch: straight to PG microseconds, no datetime needed
+        return struct.pack(">iq", 8, ts // 1000 - PG_EPOCH_UNIX_MICROS)
+    delta = _ts_datetime(ts) - PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return struct.pack(">iq", 8, micros)
+
+def _copy_binary(rows: List[tuple]) -> io.BytesIO:
+    """
+    Encode inference rows as a binary COPY stream.
+    """
+    buf = io.BytesIO()
+    write = buf.write
+    write(COPY_HEADER)
+    for ts, model_id, model_version, request_id, pred_type, latency_ms, features, y_pred_num, y_pred_text, segment in rows:
+        write(struct.pack(">h", 10))
+        write(_copy_timestamptz(ts))
+        write(_copy_text(model_id))
+        write(_copy_text(model_version))
+        write(_copy_text(request_id))
+        write(_copy_text(pred_type))
+        write(COPY_NULL if latency_ms is None else struct.pack(">ii", 4, int(latency_ms)))
+        write(_copy_jsonb(features))
+        write(COPY_NULL if y_pred_num is None else struct.pack(">id", 8, float(y_pred_num)))
+        write(_copy_text(y_pred_text))
+        write(_copy_jsonb(segment))
+    write(COPY_TRAILER)
+    buf.seek(0)
+    return buf
+
+def _check_model(model_id: str, model_version: str, pred_type: str):
+    """
+    Reject in the caller what the schema would reject for the whole queued batch.
+    """
+    if model_id is None or model_version is None:
+        raise ValueError("model_id and model_version are required")
+    if pred_type is not None and pred_type not in PRED_TYPES:
+        raise ValueError(f"pred_type must be one of {PRED_TYPES}, got {pred_type!r}")
+
+def _check_timestamp(timestamp: Optional[datetime.datetime]):
+    if timestamp is not None and not isinstance(timestamp, datetime.datetime):
+        raise ValueError(f"timestamp must be a datetime, got {type(timestamp).__name__}")
+
+def _inference_row(
+    model_id: str,
+    model_version: str,
+    features: Dict[str, Any],
+    pred_type: str,
+    y_pred_num: Optional[float] = None,
+    y_pred_text: Optional[str] = None,
+    latency_ms: Optional[int] = 0,
+    request_id: Optional[str] = None,
+    timestamp: Optional[datetime.datetime] = None,
+    segment: Optional[Dict[str, Any]] = None,
+    privacy_mode: str = "summary",
+    encode: bool = True
+) -> tuple:
+    """
+    Build the inference_events row for one event (see MLOpsClient.log_inference).
+    Shared by the sync and async clients. With encode=False the features and
+    segment dicts are left as-is, for _encode_row to serialize later.
+    Raises ValueError for values inference_events can't store (see _check_model).
+    """
+    _check_model(model_id, model_version, pred_type)
+    _check_timestamp(timestamp)
+    now_ns = time.time_ns()
+    if request_id is None:
+        request_id = _uuid7(now_ns)
+        
+    # Cheaper than datetime.now(); converted off the caller thread by the writer
+    ts = timestamp or now_ns
+    
+    # In a real impl, if privacy_mode == 'summary', we would bin/hash features here.
+    # For the MVP, we pass features directly to features_json.
+    features_json = features 
+
+    row = (
+        ts,
+        model_id,
+        model_version,
+        request_id,
+        pred_type,
+        latency_ms,
+        features_json,
+        y_pred_num,
+        y_pred_text,
+        segment or None
+    )
+    return _encode_row(row) if encode else row
+
+def _encode_row(row: tuple) -> tuple:
+    """
+    Serialize the features and segment of an unencoded inference row.
+    A segment that is already a str was pre-encoded (see MLOpsClient.for_model).
+    """
+    # Segments repeat a lot, but orjson encodes a small dict faster than a cache
+    # could build its key from the items; for_model is how to skip the work.
+    segment = row[9]
+    if segment is not None and not isinstance(segment, str):
+        segment = _dumps(segment)
+    return row[:6] + (_dumps(row[6]), row[7], row[8], segment)
 
 class MLOpsClient:
-    def __init__(self, database_url: Optional[str] = None):
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        write_method: str = "copy",
+        partitioned: bool = False,
+        ingest_durability: str = "sync"
+    ):
+        """
+        Args:
+            batch_size: most rows the background writer puts in one write.
+            write_method: how the writer inserts a batch, 'copy' (binary COPY)
+                          or 'values' (multi-row INSERT).
+            partitioned: inference_events is partitioned by week
+                         (migrations/001_partition_inference_events.sql); COPY
+                         batches straight into each row's partition instead of
+                         routing them through the parent table.
+            ingest_durability: 'sync' (default) waits for each write's WAL flush.
+                               'async' doesn't, so a Postgres crash can lose the last
+                               few hundred ms of acknowledged events and labels (never
+                               corrupt them). For telemetry that can go entirely on a
+                               crash, migrations/002_unlogged_inference_events.sql
+                               skips the WAL altogether.
+        """
         self.dsn = database_url or os.getenv("DATABASE_URL")
         if not self.dsn:
             raise ValueError("DATABASE_URL must be set in environment or passed to constructor")
+        if write_method not in WRITE_METHODS:
+            raise ValueError(f"Unknown write method: {write_method!r}")
+        if ingest_durability not in INGEST_DURABILITY_SQL:
+            raise ValueError(f"Unknown ingest durability: {ingest_durability!r}")
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.write_method = write_method
+        self.partitioned = partitioned
+        self.ingest_durability = ingest_durability
+        self._partitions = set()  # Partition tables seen to exist
+        # Pool of long-lived connections, created on first use. Lets the writer
+        # thread and synchronous calls run side by side without reconnecting.
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(POOL_MAX_CONN)
+        # Per pooled connection: the statements PREPAREd on it and one reused cursor.
+        # Dropped once the connection is closed.
+        self._prepared = weakref.WeakKeyDictionary()
+        self._cursors = weakref.WeakKeyDictionary()
+
+        # Counters
+        self.dropped_events = 0
+        self.write_failures = 0
+
+        # log_inference only enqueues; the writer thread batches rows into the DB.
+        # Started with the first queued event, so clients that never queue stay threadless.
+        self._queue = queue.Queue(maxsize=MAX_QUEUE)
+        self._writer = None
+        self._writer_lock = threading.Lock()
         
-    def _get_conn(self):
-        return psycopg2.connect(self.dsn)
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = _pg().pool.ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, self.dsn)
+            return self._pool
+
+    @contextmanager
+    def _conn(self):
+        """
+        Borrow a pooled connection for one operation, waiting for one if all
+        POOL_MAX_CONN are in use.
+        """
+        pool = self._get_pool()
+        # The pool raises PoolError instead of waiting when it is exhausted
+        self._pool_slots.acquire()
+        try:
+            conn = pool.getconn()
+        except BaseException:
+            self._pool_slots.release()
+            raise
+        try:
+            if conn not in self._prepared:
+                # New connection. Every write is a single statement, so let it be its
+                # own transaction: saves the BEGIN and COMMIT round-trips psycopg2 would add.
+                conn.autocommit = True
+                _pg().extras.register_default_jsonb(conn_or_curs=conn, loads=orjson.loads)
+                cur = conn.cursor()
+                durability_sql = INGEST_DURABILITY_SQL[self.ingest_durability]
+                if durability_sql:
+                    cur.execute(durability_sql)
+                self._prepared[conn] = set()
+                self._cursors[conn] = cur
+            yield conn
+        finally:
+            pool.putconn(conn, close=conn.closed != 0)
+            self._pool_slots.release()
+            if conn.closed:
+                # The cursor refers back to its connection, so the weak keys alone won't let go
+                self._cursors.pop(conn, None)
+                self._prepared.pop(conn, None)
+
+    def _prepare(self, cur, name: str):
+        """
+        PREPARE a named statement on the cursor's connection if not done yet.
+        """
+        prepared = self._prepared[cur.connection]
+        if name not in prepared:
+            cur.execute(PREPARED_SQL[name])
+            prepared.add(name)
+
+    def _run(self, work, *args):
+        """
+        Run work(cur, *args) on a pooled connection and return its result.
+        Connections are in autocommit mode, so each statement work issues
+        commits on its own; writes must therefore be a single statement.
+        If the connection turns out to be dead, retry on another; after a server
+        restart every idle pooled connection may be dead, so allow for all of them.
+        """
+        pg = _pg()
+        attempts = POOL_MIN_CONN + 1
+        for attempt in range(attempts):
+            with self._conn() as conn:
+                try:
+                    return work(self._cursors[conn], *args)
+                except (pg.InterfaceError, pg.OperationalError):
+                    # A closed connection is discarded by the pool on the way out;
+                    # an open one failed for another reason (e.g. statement timeout)
+                    if conn.closed == 0 or attempt == attempts - 1:
+                        raise
 
     def log_inference(
         self,
@@ -27,48 +413,275 @@ class MLOpsClient:
         request_id: Optional[str] = None,
         timestamp: Optional[datetime.datetime] = None,
         segment: Optional[Dict[str, Any]] = None,
-        privacy_mode: str = "summary"
+        privacy_mode: str = "summary",
+        sync: bool = False
     ) -> str:
         """
         Log an inference event.
         
+        Events are queued and written by a background thread in batches of up
+        to batch_size; call flush() to wait until they are stored. If the queue
+        is full the event is dropped and counted in dropped_events.
+        
+        The writer thread also does the JSON encoding, so features and segment
+        are queued by reference: don't mutate them after logging. An event that
+        can't be encoded, or that the database rejects, is dropped there on its
+        own and counted in dropped_events. Values the schema is known to reject
+        (a missing model_id or model_version, an unknown pred_type, a timestamp
+        that isn't a datetime) raise ValueError here instead.
+        
         Args:
+            timestamp: event time, default now. A naive datetime is taken as UTC.
             privacy_mode: 'summary' or 'raw'. 
                           For this MVP, we store the features dict as JSONB regardless,
                           but in a real system 'summary' would sketch it first.
+            sync: write this event in its own transaction before returning,
+                  for callers that need the row stored once they get its request_id.
         """
-        if request_id is None:
-            request_id = str(uuid.uuid4())
-            
-        ts = timestamp or datetime.datetime.now(datetime.timezone.utc)
-        
-        # In a real impl, if privacy_mode == 'summary', we would bin/hash features here.
-        # For the MVP, we pass features directly to features_json.
-        features_json = features 
+        row = _inference_row(
+            model_id, model_version, features, pred_type, y_pred_num, y_pred_text,
+            latency_ms, request_id, timestamp, segment, privacy_mode, encode=sync
+        )
 
-        sql = """
-        INSERT INTO inference_events 
-        (ts, model_id, model_version, request_id, pred_type, latency_ms, features_json, y_pred_num, y_pred_text, segment_json)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        if not sync:
+            if self._writer is None:
+                self._start_writer()
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped_events += 1
+            return row[3]
+
+        self._run(self._execute_inference, (_ts_datetime(row[0]),) + row[1:])
+        return row[3]
+
+    def for_model(
+        self,
+        model_id: str,
+        model_version: str,
+        pred_type: str,
+        segment: Optional[Dict[str, Any]] = None
+    ) -> Callable[..., str]:
         """
+        Bind the per-model arguments of log_inference once, for serving loops that
+        log every prediction of the same model. The segment is encoded here rather
+        than on every call, so later changes to the dict are not picked up.
         
-        with self._get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, (
-                    ts,
-                    model_id,
-                    model_version,
-                    request_id,
-                    pred_type,
-                    latency_ms,
-                    Json(features_json),
-                    y_pred_num,
-                    y_pred_text,
-                    Json(segment) if segment else None
+        Returns:
+            log(features, y_pred_num=None, y_pred_text=None, latency_ms=0,
+                request_id=None, timestamp=None) -> request_id, which queues the
+            event like log_inference (features is encoded by the writer thread).
+        """
+        _check_model(model_id, model_version, pred_type)
+        model_id = sys.intern(model_id)
+        model_version = sys.intern(model_version)
+        segment_json = _dumps(segment) if segment else None  # Passed through by _encode_row
+        put = self._queue.put_nowait
+
+        def log(
+            features: Dict[str, Any],
+            y_pred_num: Optional[float] = None,
+            y_pred_text: Optional[str] = None,
+            latency_ms: Optional[int] = 0,
+            request_id: Optional[str] = None,
+            timestamp: Optional[datetime.datetime] = None
+        ) -> str:
+            _check_timestamp(timestamp)
+            now_ns = time.time_ns()
+            if request_id is None:
+                request_id = _uuid7(now_ns)
+            if self._writer is None:
+                self._start_writer()
+            try:
+                put((
+                    timestamp or now_ns, model_id, model_version, request_id, pred_type,
+                    latency_ms, features, y_pred_num, y_pred_text, segment_json
                 ))
-            conn.commit()
-            
-        return request_id
+            except queue.Full:
+                self.dropped_events += 1
+            return request_id
+
+        return log
+
+    def _execute_inference(self, cur, row: tuple):
+        self._prepare(cur, "inference_ins")
+        cur.execute(EXECUTE_INFERENCE_SQL, row)
+
+    def log_inference_bulk(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Log many inference events in one transaction and one multi-row INSERT.
+        
+        Args:
+            events: dicts of log_inference keyword arguments, one per event.
+        Returns:
+            The request_ids, in input order.
+        """
+        rows = [_inference_row(**event) for event in events]
+        if not rows:
+            return []
+
+        self._write_rows(rows)
+        return [row[3] for row in rows]
+
+    def _write_rows(self, rows: List[tuple], method: str = "values"):
+        """
+        Insert inference rows atomically, via one multi-row INSERT ("values")
+        or a binary COPY stream ("copy").
+        """
+        if method == "copy" and self.partitioned:
+            self._run(self._copy_partitioned, rows)
+        elif method == "copy":
+            self._run(lambda cur: cur.copy_expert(COPY_INFERENCES_SQL.format(table="inference_events"), _copy_binary(rows)))
+        elif method == "values":
+            rows = [(_ts_datetime(row[0]),) + row[1:] for row in rows]
+            self._run(lambda cur: _pg().extras.execute_values(
+                cur, INSERT_INFERENCES_SQL, rows, template=INSERT_INFERENCES_TEMPLATE, page_size=len(rows)
+            ))
+        else:
+            raise ValueError(f"Unknown write method: {method!r}")
+
+    def _copy_partitioned(self, cur, rows: List[tuple]):
+        """
+        COPY rows into their weekly partitions, one stream per partition.
+        Weeks whose partition doesn't exist (yet) go through the parent table.
+        """
+        groups: Dict[str, List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(_partition_for(row[0]), []).append(row)
+
+        unknown = [name for name in groups if name not in self._partitions]
+        if unknown:
+            cur.execute(EXISTING_TABLES_SQL, (unknown,))
+            self._partitions.update(name for (name,) in cur.fetchall())
+
+        copies = [
+            (name if name in self._partitions else "inference_events", group)
+            for name, group in groups.items()
+        ]
+        if len(copies) == 1:
+            table, group = copies[0]
+            cur.copy_expert(COPY_INFERENCES_SQL.format(table=table), _copy_binary(group))
+            return
+
+        # Several weeks in one batch: keep the batch atomic despite autocommit
+        cur.execute("BEGIN")
+        try:
+            for table, group in copies:
+                cur.copy_expert(COPY_INFERENCES_SQL.format(table=table), _copy_binary(group))
+            cur.execute("COMMIT")
+        except Exception:
+            if cur.connection.closed == 0:
+                cur.execute("ROLLBACK")
+            raise
+
+    def _start_writer(self):
+        """
+        Start the writer thread, and close() at exit so queued events get written.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="mlops-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _writer_loop(self):
+        """
+        Writer thread: write queued rows once batch_size is reached or
+        FLUSH_INTERVAL has passed since the first row of the batch.
+        """
+        while True:
+            batch = []
+            item = self._queue.get()  # Idle until there is work
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while isinstance(item, tuple):
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    item = None
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    item = None
+
+            batch = self._encode_batch(batch)
+            if batch:
+                self._write_batch(batch)
+
+            if item is _STOP:
+                return
+            if item is not None:
+                item.set()  # Wake the flush() caller
+
+    def _write_batch(self, batch: List[tuple]):
+        """
+        Write a batch of queued rows. If the database rejects it, write the rows
+        one by one so a bad event only drops itself, not the events queued with it.
+        """
+        pg = _pg()
+        try:
+            self._write_rows(batch, self.write_method)
+            return
+        except (pg.OperationalError, pg.InterfaceError):
+            # Server unreachable or statement timeout: row by row would fail the same way
+            logger.exception("MLOpsClient failed to write %d inference events. Dropping them.", len(batch))
+            self.write_failures += 1
+            self.dropped_events += len(batch)
+            return
+        except Exception as e:
+            self.write_failures += 1
+            if len(batch) > 1:
+                logger.warning("MLOpsClient batch of %d inference events rejected (%s); retrying row by row.",
+                               len(batch), e)
+
+        for row in batch:
+            try:
+                self._write_rows([row], self.write_method)
+            except Exception as e:
+                logger.warning("MLOpsClient dropped inference event %s: %s", row[3], e)
+                self.dropped_events += 1
+
+    def _encode_batch(self, batch: List[tuple]) -> List[tuple]:
+        """
+        Serialize the JSON payloads of queued rows, dropping any that can't be.
+        """
+        rows = []
+        for row in batch:
+            try:
+                rows.append(_encode_row(row))
+            except orjson.JSONEncodeError as e:
+                logger.warning("MLOpsClient dropped inference event %s: %s", row[3], e)
+                self.dropped_events += 1
+        return rows
+
+    def flush(self):
+        """
+        Block until every event logged so far has been written (or dropped after a failed write).
+        """
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """
+        Write queued events, stop the writer and close pooled connections.
+        Registered with atexit once events are queued, so calling it explicitly is
+        optional. The client stays usable: later calls start a new writer and pool.
+        """
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                if writer.is_alive():
+                    self._queue.put(_STOP)
+                    writer.join()
+                atexit.unregister(self.close)
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
 
     def log_label(
         self,
@@ -79,47 +692,53 @@ class MLOpsClient:
         timestamp: Optional[datetime.datetime] = None
     ):
         """
-        Log a delayed label.
-        """
-        ts = timestamp or datetime.datetime.now(datetime.timezone.utc)
-        
-        sql = """
-        INSERT INTO label_events
-        (ts_label, model_id, request_id, y_true_num, y_true_text)
-        VALUES (%s, %s, %s, %s, %s)
+        Log a delayed label. A naive timestamp is taken as UTC, as in log_inference.
         """
+        ts = _ts_datetime(timestamp) if timestamp else datetime.datetime.now(datetime.timezone.utc)
         
-        with self._get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, (
-                    ts,
-                    model_id,
-                    request_id,
-                    y_true_num,
-                    y_true_text
-                ))
-            conn.commit()
+        self._run(self._execute_label, (
+            ts,
+            model_id,
+            request_id,
+            y_true_num,
+            y_true_text
+        ))
+
+    def _execute_label(self, cur, params: tuple):
+        self._prepare(cur, "label_ins")
+        cur.execute(EXECUTE_LABEL_SQL, params)
 
     def check_schema(self) -> bool:
         """
         Validates that the database schema exists.
         Returns True if 'inference_events' table is found.
         """
-        sql = "SELECT to_regclass('public.inference_events')"
-        with self._get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql)
-                result = cur.fetchone()
-                return result and result[0] == 'inference_events'
+        def check(cur):
+            cur.execute(CHECK_SCHEMA_SQL)
+            result = cur.fetchone()
+            return result and result[0] == 'inference_events'
+
+        return self._run(check)
 
-    def get_inference_count(self) -> int:
+    def get_inference_count(self, exact: bool = False) -> int:
         """
         Returns the total number of inference events logged.
+        
+        Args:
+            exact: run count(*), a full table scan. By default the planner's
+                   row estimate (pg_class.reltuples) is returned instead; it is
+                   free to read but only as fresh as the last VACUUM/ANALYZE.
+                   Falls back to count(*) if the table has never been analyzed.
         """
-        sql = "SELECT count(*) FROM inference_events"
-        with self._get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql)
-                return cur.fetchone()[0]
+        def count(cur):
+            if not exact:
+                cur.execute(ESTIMATE_INFERENCES_SQL)
+                estimate = cur.fetchone()[0]
+                if estimate >= 0:
+                    return estimate
+            cur.execute(COUNT_INFERENCES_SQL)
+            return cur.fetchone()[0]
+
+        return self._run(count)
 
 
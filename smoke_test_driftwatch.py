@@ -23,9 +23,10 @@ def run_smoke_test():
         return
 
     # 1. Log 5 dummy events
+    # One log_inference_bulk call per batch of events is the way to log many at once
     logger.info("Logging 5 smoke test events...")
-    for i in range(5):
-        dw.log_inference(
+    events = [
+        dict(
             model_id="smoke_test_model",
             model_version="v0.0.1",
             ts=datetime.now(),
@@ -45,6 +46,9 @@ def run_smoke_test():
             },
             request_id=f"smoke-{i}"
         )
+        for i in range(5)
+    ]
+    dw.log_inference_bulk(events)
 
     # 2. Flush
     logger.info("Flushing events...")